@@ -0,0 +1,404 @@
+"""
+AI-NOC load and regression benchmarks
+
+Stages (each runs in its own process so peak memory is per stage):
+
+    snmp       SNMPCollector cycles against simulated agents on loopback
+    netflow    NetFlowAnalyzer fed by the packet blaster
+    dashboard  WebSocket client swarm against the dashboard backend
+    wire       binary sample batch encode/decode (see wire_format.py)
+
+Results are compared with benchmarks/baseline.json; any metric that is worse
+than the baseline by more than --tolerance is reported and the run exits 1.
+Baselines are machine specific: refresh them with --save-baseline on the
+machine that runs the comparison.
+
+Usage: python benchmarks/run_benchmarks.py [--stages snmp,netflow] [--repeat 3] [--save-baseline]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+COLLECTOR_DIR = os.path.join(REPO_ROOT, "src", "data-collector")
+DASHBOARD_DIR = os.path.join(REPO_ROOT, "src", "dashboard", "backend")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+STAGES = ("snmp", "netflow", "dashboard", "wire")
+
+# Which direction is better for each reported metric
+HIGHER_IS_BETTER = {
+    "devices_per_s", "oids_per_s", "success_ratio",
+    "flows_per_s", "received_ratio",
+    "connected_ratio", "messages_per_s",
+    "encode_samples_per_s", "decode_samples_per_s",
+}
+LOWER_IS_BETTER = {
+    "poll_p50_ms", "poll_p95_ms", "poll_p99_ms", "cycle_s", "first_cycle_s",
+    "latency_p50_ms", "latency_p95_ms", "latency_p99_ms", "queue_drops",
+    "connect_p50_ms", "connect_p95_ms", "connect_p99_ms", "push_interval_p99_ms",
+    "bytes_per_sample", "peak_rss_mb", "server_peak_rss_mb",
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 / 1024
+
+
+def process_peak_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def bench_snmp(devices=1000, latency_ms=20.0, port=16161):
+    """Poll every simulated device the way SNMPCollector.collection_loop does
+
+    The first cycle registers every target with pysnmp and is reported on
+    its own; the steady-state figures come from the second cycle.
+    """
+    sys.path.insert(0, COLLECTOR_DIR)
+    import snmp_agent_sim
+    from snmp_collector import SNMPCollector
+
+    ctx = multiprocessing.get_context("spawn")
+    ready, stop = ctx.Event(), ctx.Event()
+    agents = ctx.Process(target=snmp_agent_sim.run, args=(devices, port),
+                         kwargs={"latency": latency_ms / 1000, "ready": ready, "stop": stop})
+    agents.start()
+    try:
+        if not ready.wait(120):
+            raise RuntimeError("simulated SNMP agents did not start")
+
+        latencies = []
+
+        class TimedCollector(SNMPCollector):
+            async def poll_device(self, device):
+                polled = time.perf_counter()
+                record = await super().poll_device(device)
+                latencies.append(time.perf_counter() - polled)
+                return record
+
+        collector = TimedCollector(config_path=os.devnull)
+        collector.devices = [
+            {"ip": ip, "name": f"sim-{i}", "type": "router", "snmp_port": port, "snmp_community": "public"}
+            for i, ip in enumerate(snmp_agent_sim.device_addresses(devices))
+        ]
+
+        async def cycle():
+            started = time.perf_counter()
+            records = await collector.poll_devices(collector.assigned_devices())
+            return time.perf_counter() - started, sum(len(record["metrics"]) for record in records)
+
+        async def cycles():
+            first, _ = await cycle()
+            latencies.clear()
+            collector.metrics.clear()
+            return (first, *await cycle())
+
+        first_cycle, elapsed, oids = asyncio.run(cycles())
+    finally:
+        stop.set()
+        agents.join(10)
+
+    return {
+        "devices": devices,
+        "first_cycle_s": first_cycle,
+        "cycle_s": elapsed,
+        "devices_per_s": devices / elapsed,
+        "oids_per_s": oids / elapsed,
+        "success_ratio": len(collector.metrics) / devices,
+        "poll_p50_ms": percentile(latencies, 50) * 1000,
+        "poll_p95_ms": percentile(latencies, 95) * 1000,
+        "poll_p99_ms": percentile(latencies, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_netflow(rate=5000, duration=10.0, flows=30, port=12055):
+    """Blast NetFlow v5 at the analyzer and measure decode throughput and latency"""
+    sys.path.insert(0, COLLECTOR_DIR)
+    import packet_blaster
+    from netflow_analyzer import V5_HEADER, NetFlowAnalyzer
+    from prometheus_client import REGISTRY
+
+    latencies = []
+
+    class TimedAnalyzer(NetFlowAnalyzer):
+        def parse_netflow_packet(self, data):
+            if len(data) >= V5_HEADER.size:
+                _, _, _, secs, nsecs, _, _, _, _ = V5_HEADER.unpack_from(data)
+                latencies.append(time.time() - (secs + nsecs / 1e9))
+            return super().parse_netflow_packet(data)
+
+    ctx = multiprocessing.get_context("spawn")
+    sent = ctx.Value("q", 0)
+
+    async def run():
+        analyzer = TimedAnalyzer(port=port, host="127.0.0.1", queue_size=10000)
+        await analyzer.start()
+        blaster = ctx.Process(target=packet_blaster.run,
+                              args=("netflow", "127.0.0.1", port, rate, duration, flows, sent))
+        started = time.perf_counter()
+        blaster.start()
+        while blaster.is_alive():
+            await asyncio.sleep(0.1)
+        # Let the queue drain before reading counters
+        while not analyzer.queue.empty():
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        await analyzer.stop()
+        return elapsed, analyzer.flow_count
+
+    elapsed, flow_count = asyncio.run(run())
+    received = REGISTRY.get_sample_value("netflow_packets_total") or 0
+    queue_drops = REGISTRY.get_sample_value("netflow_packets_dropped_total", {"reason": "queue_full"}) or 0
+
+    return {
+        "packets_sent": sent.value,
+        "offered_packets_per_s": sent.value / duration,
+        "received_ratio": received / sent.value if sent.value else 0,
+        "queue_drops": queue_drops,
+        "flows_per_s": flow_count / elapsed,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p95_ms": percentile(latencies, 95) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_dashboard(clients=200, duration=12.0, port=18000):
+    """Start the dashboard backend and connect a WebSocket swarm to it"""
+    import ws_swarm
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=DASHBOARD_DIR,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("dashboard backend did not start")
+                time.sleep(0.2)
+
+        started = time.perf_counter()
+        stats = asyncio.run(ws_swarm.swarm(f"ws://127.0.0.1:{port}/ws/realtime", clients, duration))
+        elapsed = time.perf_counter() - started
+        server_rss = process_peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(10)
+
+    return {
+        "clients": clients,
+        "connected_ratio": len(stats["connect"]) / clients,
+        "connect_p50_ms": percentile(stats["connect"], 50) * 1000,
+        "connect_p95_ms": percentile(stats["connect"], 95) * 1000,
+        "connect_p99_ms": percentile(stats["connect"], 99) * 1000,
+        "messages_per_s": len(stats["messages"]) / elapsed,
+        "push_interval_p99_ms": percentile(stats["interval"], 99) * 1000,
+        "server_peak_rss_mb": server_rss,
+    }
+
+
+def bench_wire(devices=2000, metrics=50, rounds=5):
+    """Binary batch codec throughput on one 100k-series collection cycle"""
+    sys.path.insert(0, COLLECTOR_DIR)
+    from common.sample_codec import decode_batch, encode_batch
+    from wire_format import build_records, timed
+
+    records = build_records(devices, metrics)
+    samples = devices * metrics
+    encode_time, payload = timed(lambda: encode_batch(records), rounds)
+    decode_time, _ = timed(lambda: decode_batch(payload), rounds)
+    return {
+        "bytes_per_sample": len(payload) / samples,
+        "encode_samples_per_s": samples / encode_time,
+        "decode_samples_per_s": samples / decode_time,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _run_stage(name, options, results):
+    sys.path[:0] = [BENCH_DIR, SRC_DIR]
+    try:
+        results.put(globals()[f"bench_{name}"](**options))
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_stage(name, options):
+    """Run one stage in a fresh interpreter and return its metrics"""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=_run_stage, args=(name, options, results))
+    proc.start()
+    while True:
+        try:
+            result = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if not proc.is_alive():
+                return {"error": f"stage process exited with code {proc.exitcode}"}
+    proc.join()
+    return result
+
+
+def median_result(runs):
+    """Per-metric median across repeated runs of one stage"""
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+def compare(results, baseline, tolerance, slack_ms=0.0, zero_slack=0.0):
+    """Return (stage, metric, baseline, current, change) for every regression
+
+    Millisecond metrics must also move by more than ``slack_ms`` so that
+    scheduler noise on sub-millisecond latencies is not reported. A metric
+    whose baseline is zero has no relative change, so it regresses once it
+    moves more than ``zero_slack`` (or ``slack_ms``) the wrong way.
+    """
+    regressions = []
+    for stage, metrics in results.items():
+        for metric, current in metrics.items():
+            expected = baseline.get(stage, {}).get(metric)
+            if not isinstance(expected, (int, float)) or current != current:
+                continue
+            delta = current - expected
+            if metric.endswith("_ms") and abs(delta) <= slack_ms:
+                continue
+            if not expected:
+                worse = -delta if metric in HIGHER_IS_BETTER else delta if metric in LOWER_IS_BETTER else 0
+                if worse > (slack_ms if metric.endswith("_ms") else zero_slack):
+                    regressions.append((stage, metric, expected, current, float("inf") if delta > 0 else float("-inf")))
+                continue
+            change = delta / abs(expected)
+            if (metric in HIGHER_IS_BETTER and change < -tolerance) or \
+                    (metric in LOWER_IS_BETTER and change > tolerance):
+                regressions.append((stage, metric, expected, current, change))
+    return regressions
+
+
+def option_mismatches(options, baseline):
+    """Stages whose run options differ from the ones the baseline was recorded with"""
+    recorded = baseline.get("_environment", {}).get("options", {})
+    return {
+        stage: (stage_options, recorded.get(stage))
+        for stage, stage_options in options.items()
+        if recorded.get(stage) != stage_options
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--devices", type=int, default=1000, help="simulated SNMP devices")
+    parser.add_argument("--snmp-latency-ms", type=float, default=20, help="simulated SNMP round-trip time")
+    parser.add_argument("--netflow-rate", type=int, default=5000, help="NetFlow packets per second")
+    parser.add_argument("--netflow-duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=200, help="WebSocket clients")
+    parser.add_argument("--ws-duration", type=float, default=12)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the median is reported")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--slack-ms", type=float, default=25.0,
+                        help="latency changes smaller than this are never regressions")
+    parser.add_argument("--zero-slack", type=float, default=0.0,
+                        help="allowed change for metrics whose baseline is zero, such as queue_drops")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    options = {
+        "snmp": {"devices": args.devices, "latency_ms": args.snmp_latency_ms},
+        "netflow": {"rate": args.netflow_rate, "duration": args.netflow_duration},
+        "dashboard": {"clients": args.clients, "duration": args.ws_duration},
+        "wire": {},
+    }
+
+    results, errors = {}, {}
+    for name in args.stages.split(","):
+        if name not in STAGES:
+            parser.error(f"unknown stage {name!r}")
+        print(f"Running {name} benchmark...", flush=True)
+        runs = [run_stage(name, options[name]) for _ in range(args.repeat)]
+        failed = [run["error"] for run in runs if "error" in run]
+        if failed:
+            errors[name] = failed[0]
+            print(f"  failed: {failed[0]}")
+            continue
+        results[name] = result = median_result(runs)
+        for metric, value in result.items():
+            print(f"  {metric:<24} {value:>14.2f}" if isinstance(value, float) else f"  {metric:<24} {value:>14}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "errors": errors}, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        baseline["_environment"] = {"python": platform.python_version(), "machine": platform.machine(),
+                                    "cpus": os.cpu_count(), "repeat": args.repeat, "options": options}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 1 if errors else 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --save-baseline first")
+        return 1 if errors else 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    # Results from different devices, rates or client counts are not comparable
+    mismatched = option_mismatches({name: options[name] for name in results}, baseline)
+    for stage, (current_options, recorded_options) in mismatched.items():
+        print(f"NOT COMPARED {stage}: run with {current_options}, baseline recorded with {recorded_options}")
+        del results[stage]
+    regressions = compare(results, baseline, args.tolerance, args.slack_ms, args.zero_slack)
+    for stage, metric, expected, current, change in regressions:
+        print(f"REGRESSION {stage}.{metric}: {expected:.2f} -> {current:.2f} ({change:+.0%})")
+    if not regressions and results:
+        print(f"No regressions beyond {args.tolerance:.0%} of baseline")
+    return 1 if regressions or errors or mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Simulated SNMPv2c agents for load testing the collector
+
+Each fake device listens on its own loopback address (127.1.0.1, 127.1.0.2,
+...) on one shared port and answers GET / GETNEXT / GETBULK from a small MIB
+containing the OIDs the collector polls. Counters advance on every read.
+Responses can be delayed to stand in for network round-trip time.
+
+Usage: python benchmarks/snmp_agent_sim.py [--devices 1000] [--port 16161] [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import bisect
+import ipaddress
+import resource
+import signal
+
+# config/devices.yaml plus SNMPCollector.DEFAULT_OIDS
+SIMULATED_OIDS = {
+    "1.3.6.1.2.1.1.1.0": (0x04, b"AI-NOC simulated device"),
+    "1.3.6.1.2.1.1.3.0": (0x43, 0),             # sysUpTime (TimeTicks)
+    "1.3.6.1.2.1.2.2.1.10.1": (0x41, 0),        # ifInOctets.1 (Counter32)
+    "1.3.6.1.2.1.2.2.1.16.1": (0x41, 0),        # ifOutOctets.1
+    "1.3.6.1.4.1.9.9.109.1.1.1.1.7.1": (0x42, 23),
+    "1.3.6.1.4.1.9.9.147.1.2.2.2.1.5.40.6": (0x42, 1200),
+    "1.3.6.1.4.1.9.9.221.1.1.1.1.18.1.1": (0x42, 512 * 1024 * 1024),
+    "1.3.6.1.4.1.2021.4.5.0": (0x02, 16 * 1024 * 1024),
+    "1.3.6.1.4.1.2021.4.6.0": (0x02, 6 * 1024 * 1024),
+    "1.3.6.1.4.1.2021.9.1.9.1": (0x02, 41),
+    "1.3.6.1.4.1.2021.11.11.0": (0x02, 87),
+}
+
+GET, GETNEXT, RESPONSE, GETBULK = 0xA0, 0xA1, 0xA2, 0xA5
+END_OF_MIB_VIEW, NO_SUCH_OBJECT = 0x82, 0x80
+COUNTER_TAGS = (0x41, 0x43)
+
+
+def _encode_length(length: int) -> bytes:
+    if length < 0x80:
+        return bytes([length])
+    encoded = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([0x80 | len(encoded)]) + encoded
+
+
+def _tlv(tag: int, value: bytes) -> bytes:
+    return bytes([tag]) + _encode_length(len(value)) + value
+
+
+def _encode_int(tag: int, value: int, unsigned: bool = False) -> bytes:
+    length = max(1, (value.bit_length() + 8) // 8)
+    return _tlv(tag, value.to_bytes(length, "big", signed=not unsigned))
+
+
+def _encode_oid(oid: tuple) -> bytes:
+    body = bytearray([40 * oid[0] + oid[1]])
+    for arc in oid[2:]:
+        chunk = [arc & 0x7F]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | (arc & 0x7F))
+            arc >>= 7
+        body.extend(reversed(chunk))
+    return _tlv(0x06, bytes(body))
+
+
+def _decode_tlv(data: bytes, offset: int):
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        n = length & 0x7F
+        length = int.from_bytes(data[offset:offset + n], "big")
+        offset += n
+    return tag, data[offset:offset + length], offset + length
+
+
+def _decode_oid(body: bytes) -> tuple:
+    arcs = [body[0] // 40, body[0] % 40]
+    value = 0
+    for byte in body[1:]:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(value)
+            value = 0
+    return tuple(arcs)
+
+
+class SimulatedMib:
+    """Sorted OID table shared by all devices"""
+
+    def __init__(self):
+        self.oids = sorted(tuple(map(int, oid.split("."))) for oid in SIMULATED_OIDS)
+        self.values = {tuple(map(int, oid.split("."))): v for oid, v in SIMULATED_OIDS.items()}
+
+    def get(self, oid: tuple):
+        if oid not in self.values:
+            return oid, NO_SUCH_OBJECT, None
+        tag, value = self.values[oid]
+        return oid, tag, value
+
+    def get_next(self, oid: tuple):
+        index = bisect.bisect_right(self.oids, oid)
+        if index == len(self.oids):
+            return oid, END_OF_MIB_VIEW, None
+        return self.get(self.oids[index])
+
+
+class AgentProtocol(asyncio.DatagramProtocol):
+    def __init__(self, mib: SimulatedMib, device_seed: int, community: bytes, latency: float = 0.0):
+        self.mib = mib
+        self.device_seed = device_seed
+        self.community = community
+        self.latency = latency
+        self.reads = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def _encode_value(self, tag: int, value):
+        if tag in (NO_SUCH_OBJECT, END_OF_MIB_VIEW):
+            return bytes([tag, 0])
+        if tag == 0x04:
+            return _tlv(0x04, value)
+        if tag in COUNTER_TAGS:
+            # Grow counters per read so successive polls see traffic
+            value = (self.reads * 1500 * (self.device_seed % 7 + 1)) & 0xFFFFFFFF
+        return _encode_int(tag, value, unsigned=tag != 0x02)
+
+    def datagram_received(self, data, addr):
+        try:
+            _, message, _ = _decode_tlv(data, 0)
+            _, version, offset = _decode_tlv(message, 0)
+            _, community, offset = _decode_tlv(message, offset)
+            pdu_type, pdu, _ = _decode_tlv(message, offset)
+            _, request_id, offset = _decode_tlv(pdu, 0)
+            _, non_repeaters, offset = _decode_tlv(pdu, offset)
+            _, max_repetitions, offset = _decode_tlv(pdu, offset)
+            _, varbinds, _ = _decode_tlv(pdu, offset)
+        except (IndexError, ValueError):
+            return
+        if community != self.community:
+            return
+
+        oids = []
+        offset = 0
+        while offset < len(varbinds):
+            _, varbind, offset = _decode_tlv(varbinds, offset)
+            _, oid, _ = _decode_tlv(varbind, 0)
+            oids.append(_decode_oid(oid))
+
+        self.reads += 1
+        answers = []
+        if pdu_type == GET:
+            answers = [self.mib.get(oid) for oid in oids]
+        elif pdu_type == GETNEXT:
+            answers = [self.mib.get_next(oid) for oid in oids]
+        elif pdu_type == GETBULK:
+            repeat = int.from_bytes(max_repetitions, "big") or 1
+            for oid in oids:
+                for _ in range(repeat):
+                    oid, tag, value = self.mib.get_next(oid)
+                    answers.append((oid, tag, value))
+                    if tag == END_OF_MIB_VIEW:
+                        break
+        else:
+            return
+
+        body = b"".join(
+            _tlv(0x30, _encode_oid(oid) + self._encode_value(tag, value)) for oid, tag, value in answers
+        )
+        pdu = _tlv(0x02, request_id) + _encode_int(0x02, 0) + _encode_int(0x02, 0) + _tlv(0x30, body)
+        response = _tlv(0x30, _tlv(0x02, version) + _tlv(0x04, community) + _tlv(RESPONSE, pdu))
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+
+def device_addresses(devices: int, base: str = "127.1.0.1"):
+    start = ipaddress.IPv4Address(base)
+    return [str(start + i) for i in range(devices)]
+
+
+async def serve(devices: int, port: int = 16161, community: str = "public", base: str = "127.1.0.1",
+                latency: float = 0.0, ready=None, stop=None):
+    """Start one agent per loopback address and run until stop is set"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < devices + 256:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, devices + 256), hard))
+
+    loop = asyncio.get_running_loop()
+    mib = SimulatedMib()
+    transports = []
+    for seed, ip in enumerate(device_addresses(devices, base)):
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda seed=seed: AgentProtocol(mib, seed, community.encode(), latency), local_addr=(ip, port)
+        )
+        transports.append(transport)
+
+    if ready is not None:
+        ready.set()
+    try:
+        while stop is None or not stop.is_set():
+            await asyncio.sleep(0.2)
+    finally:
+        for transport in transports:
+            transport.close()
+
+
+def run(devices: int, port: int, community: str = "public", latency: float = 0.0, ready=None, stop=None):
+    """Process entry point for multiprocessing"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(serve(devices, port, community, latency=latency, ready=ready, stop=stop))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=16161)
+    parser.add_argument("--community", default="public")
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay before each response")
+    args = parser.parse_args()
+    print(f"Simulating {args.devices} SNMP agents on {device_addresses(1)[0]}+ port {args.port}")
+    asyncio.run(serve(args.devices, args.port, args.community, latency=args.latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Binary sample batch vs JSON - size and encode/decode CPU
+
+Usage: python benchmarks/wire_format.py [--devices 2000] [--metrics 50] [--rounds 5]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from common.sample_codec import decode_batch, encode_batch  # noqa: E402
+
+
+def build_records(devices: int, metrics: int):
+    """One collection cycle shaped like SNMPCollector.metrics values"""
+    rng = random.Random(42)
+    now = time.time()
+    records = []
+    for i in range(devices):
+        device = {
+            "ip": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}",
+            "name": f"Device {i}",
+            "type": rng.choice(["router", "switch", "firewall", "server"]),
+            "location": rng.choice(["Data Center", "Floor 3", "DMZ"]),
+            "snmp_community": "public",
+            "snmp_port": 161,
+        }
+        records.append({
+            "timestamp": now + i * 0.002,
+            "metrics": {f"ifInOctets.{m}": rng.randrange(2 ** 40) for m in range(metrics)},
+            "device_info": device,
+        })
+    return records
+
+
+def timed(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--metrics", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    records = build_records(args.devices, args.metrics)
+    series = args.devices * args.metrics
+    print(f"{args.devices} devices x {args.metrics} metrics = {series} series")
+
+    formats = {
+        "json": (lambda: json.dumps(records).encode(), lambda b: json.loads(b)),
+        "json+zlib": (lambda: zlib.compress(json.dumps(records).encode(), 1),
+                      lambda b: json.loads(zlib.decompress(b))),
+        "binary": (lambda: encode_batch(records, compress=False), decode_batch),
+        "binary+zlib": (lambda: encode_batch(records), decode_batch),
+    }
+
+    print(f"{'format':<12} {'bytes':>12} {'B/sample':>9} {'encode ms':>10} {'decode ms':>10}")
+    for name, (encode, decode) in formats.items():
+        encode_time, payload = timed(encode, args.rounds)
+        decode_time, _ = timed(lambda: decode(payload), args.rounds)
+        print(f"{name:<12} {len(payload):>12} {len(payload) / series:>9.2f} "
+              f"{encode_time * 1000:>10.1f} {decode_time * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+WebSocket client swarm for the dashboard backend
+
+Opens many concurrent connections to /ws/realtime and records connect
+latency, messages received and the spacing between pushes per client.
+
+Usage: python benchmarks/ws_swarm.py [--url ws://localhost:8000/ws/realtime] [--clients 500]
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import websockets
+
+
+async def _client(url: str, duration: float, stats: Dict[str, List[float]], start_gate: asyncio.Event):
+    await start_gate.wait()
+    started = time.perf_counter()
+    try:
+        async with websockets.connect(url, open_timeout=30, max_queue=None) as ws:
+            stats["connect"].append(time.perf_counter() - started)
+            deadline = started + duration
+            last = None
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(ws.recv(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                now = time.perf_counter()
+                stats["messages"].append(now)
+                if last is not None:
+                    stats["interval"].append(now - last)
+                last = now
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+        stats["failed"].append(time.perf_counter() - started)
+
+
+async def swarm(url: str, clients: int, duration: float) -> Dict[str, Any]:
+    """Run ``clients`` concurrent WebSocket sessions for ``duration`` seconds"""
+    stats: Dict[str, List[float]] = {"connect": [], "messages": [], "interval": [], "failed": []}
+    start_gate = asyncio.Event()
+    tasks = [asyncio.create_task(_client(url, duration, stats, start_gate)) for _ in range(clients)]
+    start_gate.set()
+    await asyncio.gather(*tasks)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8000/ws/realtime")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=15)
+    args = parser.parse_args()
+    stats = asyncio.run(swarm(args.url, args.clients, args.duration))
+    connects = sorted(stats["connect"])
+    p95 = connects[int(len(connects) * 0.95) - 1] * 1000 if connects else float("nan")
+    print(f"{len(connects)}/{args.clients} connected, {len(stats['failed'])} failed, "
+          f"{len(stats['messages'])} messages, connect p95 {p95:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
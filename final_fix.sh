@@ -34,8 +34,8 @@ EOF
 
 # Data collector requirements (WORKING VERSION)
 cat > src/data-collector/requirements.txt << 'EOF'
-pysnmp==4.4.12
-pyasn1==0.5.0
+pysnmp==7.1.30
+pyasn1==0.6.4
 aiokafka==0.10.0
 aiofiles==23.2.1
 EOF
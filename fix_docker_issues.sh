@@ -26,8 +26,8 @@ print_success() {
 print_status "Fixing data-collector requirements.txt"
 cat > src/data-collector/requirements.txt << 'EOF'
 # Data Collector Specific Requirements - FIXED VERSION
-pysnmp==4.4.12
-pyasn1==0.5.0
+pysnmp==7.1.30
+pyasn1==0.6.4
 aiokafka==0.10.0
 scapy==2.5.0
 netaddr==0.9.0
@@ -55,12 +55,12 @@ print_success "requirements.txt"
 print_status "src/data-collector/requirements.txt"
 cat > src/data-collector/requirements.txt << 'EOF'
 # Data Collector Specific Requirements
-pysnmp==4.4.12
+pysnmp==7.1.30
 snmp-mibs-compiler==0.3.4
 aiokafka==0.10.0
 scapy==2.5.0
 netaddr==0.9.0
-pyasn1==0.5.0
+pyasn1==0.6.4
 asyncio==3.4.3
 aiofiles==23.2.1
 EOF
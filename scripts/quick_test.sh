@@ -78,5 +78,8 @@ echo "   Dashboard: http://localhost:3000"
 echo "   API Docs:  http://localhost:8000/docs"
 echo "   Backend:   http://localhost:8000"
 echo ""
+echo "🧪 Unit tests: python -m pytest tests"
+echo "📈 Load/regression benchmarks: python benchmarks/run_benchmarks.py"
+echo ""
 echo "📊 Service Status:"
 docker-compose ps
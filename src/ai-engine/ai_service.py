@@ -3,9 +3,12 @@ AI-NOC AI Engine - Simple Working Version
 """
 import asyncio
 import logging
+import os
 import random
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from common.metrics_exposition import CachedExposition, monitor_event_loop_lag
+from stream_processor import StreamProcessor
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -23,10 +26,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_startup
+exposition = CachedExposition()
+kafka_servers = os.getenv("KAFKA_BOOTSTRAP_SERVERS")
+stream_processor = StreamProcessor(kafka_servers) if kafka_servers else None
+
+@app.on_event("startup")
 async def startup_event():
+    asyncio.create_task(monitor_event_loop_lag())
+    if stream_processor:
+        await stream_processor.start()
     logger.info("🤖 AI-NOC AI Engine Started")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if stream_processor:
+        await stream_processor.stop()
+
 @app.get("/")
 async def root():
     return {"message": "AI-NOC AI Engine is running"}
@@ -40,6 +55,10 @@ async def health_check():
         "models_loaded": 3
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    return Response(content=await exposition.render(), media_type=exposition.content_type)
+
 @app.get("/api/ai/insights")
 async def get_ai_insights():
     return [
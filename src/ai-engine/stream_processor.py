@@ -1,18 +1,104 @@
 # src/ai-engine/stream_processor.py
 import asyncio
-import aioredis
+import logging
+import os
+from typing import Optional
+
 from aiokafka import AIOKafkaConsumer
+from prometheus_client import Counter
+from common.sample_codec import decode_batch
+
+logger = logging.getLogger(__name__)
+
+BATCHES_CONSUMED = Counter('ai_stream_batches_total', 'Sample batches consumed from Kafka')
+BATCH_DECODE_ERRORS = Counter('ai_stream_decode_errors_total', 'Sample batches that failed to decode')
+SAMPLES_CONSUMED = Counter('ai_stream_samples_total', 'Device samples consumed from Kafka')
+ANALYSIS_ERRORS = Counter('ai_stream_analysis_errors_total', 'Device samples whose analysis raised')
+CONSUMER_FAILURES = Counter('ai_stream_consumer_failures_total', 'Kafka consumer start or fetch failures')
 
 class StreamProcessor:
-    def __init__(self):
+    def __init__(self, bootstrap_servers: str, topic: Optional[str] = None, retry_interval: float = 10.0):
         self.redis = None
         self.kafka_consumer = None
-    
+        self.bootstrap_servers = bootstrap_servers
+        self.topic = topic or os.getenv('KAFKA_METRICS_TOPIC', 'network-metrics')
+        self.retry_interval = retry_interval
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start consuming; an unreachable broker is logged and retried in the background"""
+        self.is_running = True
+        try:
+            await self.connect()
+        except Exception as e:
+            CONSUMER_FAILURES.inc()
+            logger.error(f"Kafka unavailable, retrying every {self.retry_interval}s: {e}")
+        self._task = asyncio.create_task(self.consume_loop())
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.disconnect()
+
+    async def connect(self):
+        # Created here so the consumer binds to the running loop
+        consumer = AIOKafkaConsumer(
+            self.topic, bootstrap_servers=self.bootstrap_servers, group_id='ai-engine'
+        )
+        try:
+            await consumer.start()
+        except Exception:
+            await consumer.stop()
+            raise
+        self.kafka_consumer = consumer
+        logger.info(f"Consuming sample batches from {self.topic}")
+
+    async def disconnect(self):
+        consumer, self.kafka_consumer = self.kafka_consumer, None
+        if consumer:
+            try:
+                await consumer.stop()
+            except Exception as e:
+                logger.warning(f"Error stopping Kafka consumer: {e}")
+
+    async def consume_loop(self):
+        """Keep a consumer running until stop(), reconnecting after Kafka errors"""
+        while self.is_running:
+            try:
+                if self.kafka_consumer is None:
+                    await self.connect()
+                await self.process_network_stream()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                CONSUMER_FAILURES.inc()
+                logger.error(f"Stream processing failed, reconnecting in {self.retry_interval}s: {e}")
+                await self.disconnect()
+                await asyncio.sleep(self.retry_interval)
+
     async def process_network_stream(self):
-        # Real-time network data processing
+        # Real-time network data processing; collectors publish binary sample batches
         async for message in self.kafka_consumer:
-            await self.analyze_realtime_data(message.value)
-    
+            BATCHES_CONSUMED.inc()
+            try:
+                records = decode_batch(message.value)
+            except ValueError:
+                BATCH_DECODE_ERRORS.inc()
+                continue
+            SAMPLES_CONSUMED.inc(len(records))
+            for record in records:
+                try:
+                    await self.analyze_realtime_data(record)
+                except Exception as e:
+                    ANALYSIS_ERRORS.inc()
+                    logger.error(f"Analysis failed for {record['device_info'].get('ip')}: {e}")
+
     async def analyze_realtime_data(self, data):
         # Real-time AI analysis
         pass
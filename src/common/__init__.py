@@ -0,0 +1,6 @@
+"""
+Code shared by the AI-NOC Python services
+
+Each service image copies this package to /app/common next to its own
+sources. When running a service from a checkout, put src/ on PYTHONPATH.
+"""
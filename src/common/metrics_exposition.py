@@ -0,0 +1,53 @@
+# src/common/metrics_exposition.py
+"""
+Prometheus exposition helpers shared by the AI-NOC services
+"""
+import asyncio
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Histogram, disable_created_metrics, generate_latest
+
+# *_created samples double the exposition size and nothing here queries them
+disable_created_metrics()
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled asyncio wakeup and when it actually ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+class CachedExposition:
+    """Serve the registry in Prometheus text format, rendered at most once per ttl
+
+    Rendering runs in a worker thread so a large registry never stalls the
+    event loop, and concurrent scrapes share a single render.
+    """
+
+    content_type = CONTENT_TYPE_LATEST
+
+    def __init__(self, registry=REGISTRY, ttl: float = 1.0):
+        self.registry = registry
+        self.ttl = ttl
+        self._body = b""
+        self._rendered_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def render(self) -> bytes:
+        if time.monotonic() - self._rendered_at < self.ttl:
+            return self._body
+        async with self._lock:
+            if time.monotonic() - self._rendered_at >= self.ttl:
+                loop = asyncio.get_running_loop()
+                self._body = await loop.run_in_executor(None, generate_latest, self.registry)
+                self._rendered_at = time.monotonic()
+        return self._body
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Record how late the event loop wakes up from a fixed sleep"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - started - interval, 0.0))
@@ -0,0 +1,275 @@
+# src/common/sample_codec.py
+"""
+Compact binary batch format for collector -> AI engine sample transport
+
+Batch layout (all integers little-endian):
+
+    magic     4s   b"NOCB"
+    version   B    FORMAT_VERSION
+    flags     B    FLAG_ZLIB if the body is zlib-compressed
+    body:
+      n_devices  I, then per device: ip, labels (JSON)   - length-prefixed UTF-8
+      n_metrics  I, then per metric name                 - length-prefixed UTF-8
+      base_ts    q    first record timestamp in milliseconds
+      n_records  I
+      ts_type    B    typecode of the timestamp delta array ("h", "i" or "q")
+      devices    I[n_records]        device index per record
+      ts_deltas  ts_type[n_records]  delta from previous record timestamp
+      counts     I[n_records]        samples per record
+      n_samples  I
+      id_type    B    typecode of the metric ID array ("H" or "I")
+      int_type   B    typecode of the integer value array ("i", "q" or "Q")
+      metric_ids id_type[n_samples]  index into the metric name dictionary
+      is_float   ceil(n_samples / 8) bytes, bit i (LSB first) set if sample i is a float
+      ints       int_type[samples with is_float clear]
+      floats     d[samples with is_float set]
+
+A series is a (device, metric name) pair: both are sent once per batch
+and samples refer to them by index. Every batch carries its own
+dictionaries so a consumer can decode any message without having seen
+earlier ones.
+
+Integer and float samples travel in separate arrays so that counters
+round-trip exactly: Counter64 values up to 2**64 - 1 use "Q", and a
+float elsewhere in the batch never turns integers into doubles.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List
+
+MAGIC = b"NOCB"
+FORMAT_VERSION = 2
+
+FLAG_ZLIB = 0x01
+
+TS_TYPES = ("h", "i", "q")
+ID_TYPES = ("H", "I")
+INT_TYPES = ("i", "q", "Q")
+
+# Device fields worth shipping with every batch; the rest of device_info
+# (OID lists, SNMP community) stays on the collector.
+LABEL_FIELDS = ("name", "type", "device_type", "location")
+
+_HEADER = struct.Struct("<4sBB")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _pack_array(values: array) -> bytes:
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_array(typecode: str, data: memoryview, offset: int, count: int):
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    if end > len(data):
+        raise ValueError(f"Truncated sample batch: {count} {typecode!r} items past end of body")
+    values.frombytes(data[offset:end])
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values, end
+
+
+def _pack_str(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return _U32.pack(len(encoded)) + encoded
+
+
+def _unpack_str(data: memoryview, offset: int):
+    (length,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    if offset + length > len(data):
+        raise ValueError("Truncated sample batch: string past end of body")
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def _narrowest_array(values: List[int], typecodes: Iterable[str]) -> array:
+    """Pack integers into the first of ``typecodes`` that holds every value exactly"""
+    for typecode in typecodes:
+        try:
+            return array(typecode, values)
+        except OverflowError:
+            continue
+    raise ValueError(f"Integer samples spanning {min(values)}..{max(values)} cannot be encoded exactly")
+
+
+def encode_batch(records: Iterable[Dict[str, Any]], compress: bool = True) -> bytes:
+    """Encode collector records into one binary batch
+
+    ``records`` have the shape SNMPCollector stores per device:
+    ``{"timestamp": <seconds>, "metrics": {name: value}, "device_info": {...}}``.
+    Raises ValueError if an integer sample falls outside the 64-bit range.
+    """
+    device_index: Dict[str, int] = {}
+    device_table: List[bytes] = []
+    metric_index: Dict[str, int] = {}
+
+    record_devices = array("I")
+    timestamps: List[int] = []
+    counts = array("I")
+    metric_names: List[str] = []
+    values: List[Any] = []
+
+    for record in records:
+        device_info = record.get("device_info") or {}
+        ip = device_info.get("ip", "")
+        dev = device_index.get(ip)
+        if dev is None:
+            dev = device_index[ip] = len(device_table)
+            labels = {k: device_info[k] for k in LABEL_FIELDS if k in device_info}
+            device_table.append(_pack_str(ip) + _pack_str(json.dumps(labels, separators=(",", ":"))))
+
+        metrics = record["metrics"]
+        record_devices.append(dev)
+        timestamps.append(int(round(record["timestamp"] * 1000)))
+        counts.append(len(metrics))
+        metric_names.extend(metrics)
+        values.extend(metrics.values())
+
+    for name in metric_names:
+        if name not in metric_index:
+            metric_index[name] = len(metric_index)
+    id_type = "H" if len(metric_index) <= 0xFFFF else "I"
+    metric_ids = array(id_type, map(metric_index.__getitem__, metric_names))
+
+    is_float = bytearray((len(values) + 7) // 8)
+    floats = array("d")
+    try:
+        int_values = _narrowest_array(values, INT_TYPES)
+    except TypeError:
+        # Integer arrays reject floats, so only mixed batches pay for splitting
+        float_positions = [i for i, value in enumerate(values) if isinstance(value, float)]
+        for i in float_positions:
+            is_float[i >> 3] |= 1 << (i & 7)
+        floats.extend(values[i] for i in float_positions)
+        int_values = _narrowest_array([value for value in values if not isinstance(value, float)], INT_TYPES)
+
+    base_ts = timestamps[0] if timestamps else 0
+    # Concurrent polls finish out of order, so deltas can be negative
+    deltas = _narrowest_array([ts - prev for prev, ts in zip([base_ts, *timestamps], timestamps)], TS_TYPES)
+
+    body = b"".join([
+        _U32.pack(len(device_table)), *device_table,
+        _U32.pack(len(metric_index)), *map(_pack_str, metric_index),
+        _I64.pack(base_ts),
+        _U32.pack(len(counts)),
+        deltas.typecode.encode("ascii"),
+        _pack_array(record_devices),
+        _pack_array(deltas),
+        _pack_array(counts),
+        _U32.pack(len(values)),
+        id_type.encode("ascii"),
+        int_values.typecode.encode("ascii"),
+        _pack_array(metric_ids),
+        bytes(is_float),
+        _pack_array(int_values),
+        _pack_array(floats),
+    ])
+
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 1)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, flags) + body
+
+
+def decode_batch(data: bytes) -> List[Dict[str, Any]]:
+    """Decode a binary batch back into collector-style records
+
+    ``device_info`` carries the IP and label fields only. Raises
+    ValueError for anything that is not a complete, well-formed batch.
+    """
+    try:
+        return _decode_batch(data)
+    except (struct.error, zlib.error, IndexError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt sample batch: {e}") from e
+
+
+def _decode_batch(data: bytes) -> List[Dict[str, Any]]:
+    magic, version, flags = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not an AI-NOC sample batch")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported sample batch version {version}")
+
+    body = memoryview(data)[_HEADER.size:]
+    if flags & FLAG_ZLIB:
+        inflater = zlib.decompressobj()
+        body = memoryview(inflater.decompress(body))
+        if not inflater.eof or inflater.unused_data:
+            raise ValueError("Corrupt sample batch: incomplete or padded zlib stream")
+
+    offset = 0
+    (n_devices,) = _U32.unpack_from(body, offset)
+    offset += _U32.size
+    devices = []
+    for _ in range(n_devices):
+        ip, offset = _unpack_str(body, offset)
+        labels, offset = _unpack_str(body, offset)
+        devices.append(dict(json.loads(labels), ip=ip))
+
+    (n_metrics,) = _U32.unpack_from(body, offset)
+    offset += _U32.size
+    metric_names = []
+    for _ in range(n_metrics):
+        name, offset = _unpack_str(body, offset)
+        metric_names.append(name)
+
+    (base_ts,) = _I64.unpack_from(body, offset)
+    offset += _I64.size
+    (n_records,) = _U32.unpack_from(body, offset)
+    offset += _U32.size
+    ts_type = chr(body[offset])
+    offset += 1
+    if ts_type not in TS_TYPES:
+        raise ValueError(f"Corrupt sample batch timestamp type {ts_type!r}")
+    record_devices, offset = _unpack_array("I", body, offset, n_records)
+    deltas, offset = _unpack_array(ts_type, body, offset, n_records)
+    counts, offset = _unpack_array("I", body, offset, n_records)
+
+    (n_samples,) = _U32.unpack_from(body, offset)
+    offset += _U32.size
+    if sum(counts) != n_samples:
+        raise ValueError(f"Corrupt sample batch: records hold {sum(counts)} samples, header says {n_samples}")
+    id_type, int_type = chr(body[offset]), chr(body[offset + 1])
+    offset += 2
+    if id_type not in ID_TYPES or int_type not in INT_TYPES:
+        raise ValueError(f"Corrupt sample batch array types {id_type!r}/{int_type!r}")
+    metric_ids, offset = _unpack_array(id_type, body, offset, n_samples)
+
+    is_float, offset = _unpack_array("B", body, offset, (n_samples + 7) // 8)
+    float_bits = int.from_bytes(is_float, "little")
+    if float_bits >> n_samples:
+        raise ValueError("Corrupt sample batch: float flags set past the last sample")
+    n_floats = bin(float_bits).count("1")
+    ints, offset = _unpack_array(int_type, body, offset, n_samples - n_floats)
+    floats, offset = _unpack_array("d", body, offset, n_floats)
+    if offset != len(body):
+        raise ValueError(f"Corrupt sample batch: {len(body) - offset} trailing bytes")
+
+    names = list(map(metric_names.__getitem__, metric_ids))
+    if n_floats:
+        next_int, next_float = iter(ints.tolist()).__next__, iter(floats.tolist()).__next__
+        values = [next_float() if is_float[i >> 3] >> (i & 7) & 1 else next_int() for i in range(n_samples)]
+    else:
+        values = ints.tolist()
+    records: List[Dict[str, Any]] = []
+    ts = base_ts
+    start = 0
+    for dev, delta, count in zip(record_devices, deltas, counts):
+        ts += delta
+        end = start + count
+        records.append({
+            "timestamp": ts / 1000,
+            "metrics": dict(zip(names[start:end], values[start:end])),
+            "device_info": devices[dev],
+        })
+        start = end
+    return records
@@ -23,7 +23,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_startup
+@app.on_event("startup")
 async def startup_event():
     logger.info("🖥️ AI-NOC Dashboard Backend Started")
 
@@ -4,7 +4,12 @@ AI-NOC Data Collector - Simple Working Version
 import asyncio
 import logging
 import os
-from fastapi import FastAPI
+from aiokafka import AIOKafkaProducer
+from fastapi import FastAPI, Response
+from common.metrics_exposition import CachedExposition, monitor_event_loop_lag
+from netflow_analyzer import NetFlowAnalyzer
+from shard_manager import ShardCoordinator
+from snmp_collector import SNMPCollector
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -13,10 +18,38 @@ logger = logging.getLogger(__name__)
 # Create FastAPI app
 app = FastAPI(title="AI-NOC Data Collector", version="1.0.0")
 
-@app.on_startup
+# Replicas split the device inventory when COLLECTOR_SHARDING is enabled
+shard = ShardCoordinator.from_env() if os.getenv("COLLECTOR_SHARDING", "false").lower() == "true" else None
+kafka_servers = os.getenv("KAFKA_BOOTSTRAP_SERVERS")
+producer = None
+snmp_collector = SNMPCollector(shard=shard)
+netflow_analyzer = NetFlowAnalyzer(port=int(os.getenv("NETFLOW_PORT", "2055")))
+exposition = CachedExposition()
+
+@app.on_event("startup")
 async def startup_event():
+    global producer
+    asyncio.create_task(monitor_event_loop_lag())
+    if shard:
+        await shard.start()
+    if kafka_servers:
+        # Created here so the producer binds to uvicorn's running loop
+        producer = AIOKafkaProducer(bootstrap_servers=kafka_servers)
+        await producer.start()
+        snmp_collector.producer = producer
+    await snmp_collector.initialize()
+    await netflow_analyzer.start()
     logger.info("🚀 AI-NOC Data Collector Started")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await snmp_collector.cleanup()
+    await netflow_analyzer.stop()
+    if producer:
+        await producer.stop()
+    if shard:
+        await shard.stop()
+
 @app.get("/")
 async def root():
     return {"message": "AI-NOC Data Collector is running"}
@@ -29,14 +62,21 @@ async def health_check():
         "version": "1.0.0"
     }
 
-@app.get("/metrics")
-async def get_metrics():
+@app.get("/shard")
+async def shard_status():
+    devices = snmp_collector.assigned_devices()
     return {
-        "devices_monitored": 4,
-        "metrics_collected": 1250,
-        "status": "collecting"
+        "sharding": shard is not None,
+        "replica_id": shard.replica_id if shard else None,
+        "members": sorted(shard.ring.nodes) if shard else [],
+        "assigned_devices": [d["ip"] for d in devices],
+        "total_devices": len(snmp_collector.devices)
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    return Response(content=await exposition.render(), media_type=exposition.content_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8080)
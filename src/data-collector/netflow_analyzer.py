@@ -1,12 +1,119 @@
 # src/data-collector/netflow_analyzer.py
+"""
+NetFlow receiver for the data collector
+Receives NetFlow export packets over UDP and decodes v5 flow records
+"""
+import asyncio
+import logging
 import socket
 import struct
+from collections import deque
+from typing import Any, Dict, List
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+V5_HEADER = struct.Struct("!HHIIIIBBH")
+V5_RECORD = struct.Struct("!4s4s4sHHIIIIHHBBBBHHBBH")
+
+NETFLOW_PACKETS = Counter('netflow_packets_total', 'NetFlow export packets received')
+NETFLOW_FLOWS = Counter('netflow_flows_total', 'NetFlow flow records decoded')
+NETFLOW_DROPS = Counter('netflow_packets_dropped_total', 'NetFlow packets not decoded', ['reason'])
+NETFLOW_QUEUE_DEPTH = Gauge('netflow_queue_depth', 'Packets waiting to be decoded')
+
+
+class _NetFlowProtocol(asyncio.DatagramProtocol):
+    def __init__(self, analyzer: "NetFlowAnalyzer"):
+        self.analyzer = analyzer
+
+    def datagram_received(self, data, addr):
+        NETFLOW_PACKETS.inc()
+        try:
+            self.analyzer.queue.put_nowait((data, addr))
+        except asyncio.QueueFull:
+            NETFLOW_DROPS.labels('queue_full').inc()
+
 
 class NetFlowAnalyzer:
-    def __init__(self, port=2055):
+    def __init__(self, port=2055, host="0.0.0.0", queue_size=10000):
         self.port = port
+        self.host = host
         self.socket = None
-    
-    def parse_netflow_packet(self, data):
-        # NetFlow v5/v9 parsing logic
-        pass
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.flows = deque(maxlen=10000)
+        self.flow_count = 0
+        self.is_running = False
+        self._transport = None
+        self._worker = None
+        NETFLOW_QUEUE_DEPTH.set_function(self.queue.qsize)
+
+    async def start(self):
+        """Bind the UDP listener and start decoding packets"""
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _NetFlowProtocol(self), local_addr=(self.host, self.port)
+        )
+        self.socket = self._transport.get_extra_info('socket')
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.is_running = True
+        self._worker = asyncio.create_task(self.process_queue())
+        logger.info(f"NetFlow analyzer listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        self.is_running = False
+        if self._transport:
+            self._transport.close()
+        if self._worker:
+            self._worker.cancel()
+        logger.info("NetFlow analyzer stopped")
+
+    async def process_queue(self):
+        while self.is_running:
+            data, addr = await self.queue.get()
+            flows = self.parse_netflow_packet(data)
+            for flow in flows:
+                flow['exporter'] = addr[0]
+            self.flows.extend(flows)
+
+    def parse_netflow_packet(self, data) -> List[Dict[str, Any]]:
+        """Decode a NetFlow v5 packet into flow records
+
+        v9/IPFIX need per-exporter template state and are counted as
+        unsupported for now.
+        """
+        if len(data) < V5_HEADER.size:
+            NETFLOW_DROPS.labels('malformed').inc()
+            return []
+
+        version, count, sys_uptime, unix_secs, _, _, _, _, _ = V5_HEADER.unpack_from(data)
+        if version != 5:
+            NETFLOW_DROPS.labels('unsupported_version').inc()
+            return []
+        if len(data) < V5_HEADER.size + count * V5_RECORD.size:
+            NETFLOW_DROPS.labels('malformed').inc()
+            return []
+
+        flows = []
+        for (src, dst, _, in_if, out_if, packets, octets, first, last,
+             src_port, dst_port, _, tcp_flags, protocol, tos, _, _, _, _, _) in V5_RECORD.iter_unpack(
+                data[V5_HEADER.size:V5_HEADER.size + count * V5_RECORD.size]):
+            flows.append({
+                'src_addr': socket.inet_ntoa(src),
+                'dst_addr': socket.inet_ntoa(dst),
+                'src_port': src_port,
+                'dst_port': dst_port,
+                'protocol': protocol,
+                'packets': packets,
+                'octets': octets,
+                'input_if': in_if,
+                'output_if': out_if,
+                'tcp_flags': tcp_flags,
+                'tos': tos,
+                'duration_ms': last - first,
+                'timestamp': unix_secs,
+            })
+
+        self.flow_count += len(flows)
+        NETFLOW_FLOWS.inc(len(flows))
+        return flows
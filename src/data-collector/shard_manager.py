@@ -0,0 +1,293 @@
+"""
+Device sharding for data-collector replicas
+Splits the device inventory across replicas with a consistent hash ring
+"""
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MEMBERS_KEY = "ai-noc:collectors:members"
+CLAIM_KEY_PREFIX = "ai-noc:collectors:claim:"
+
+# Delete a poll lease only while it still belongs to the caller
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _hash(value: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+def device_key(device: Dict[str, Any]) -> str:
+    """Shard key for a device entry from devices.yaml"""
+    return f"{device['ip']}:{device.get('snmp_port', 161)}"
+
+
+class ConsistentHashRing:
+    """Hash ring with virtual nodes
+
+    Adding or removing a replica only moves the devices that hash onto
+    that replica's arcs, roughly 1/N of the inventory.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 128):
+        self.vnodes = vnodes
+        self._ring: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self.nodes: set = set()
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            self._owners[point] = node
+            bisect.insort(self._ring, point)
+
+    def remove_node(self, node: str):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                index = bisect.bisect_left(self._ring, point)
+                del self._ring[index]
+
+    def get_node(self, key: str) -> Optional[str]:
+        """Return the replica responsible for key"""
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._ring, _hash(key)) % len(self._ring)
+        return self._owners[self._ring[index]]
+
+
+class LocalMembership:
+    """In-process stand-in for the Redis membership store
+
+    Instances sharing the same ``registry`` dict behave like replicas
+    sharing one Redis, which is enough for development and tests.
+    """
+
+    _default_registry: Dict[str, Any] = {"members": {}, "claims": {}}
+
+    def __init__(self, registry: Optional[Dict[str, Any]] = None):
+        self.registry = registry if registry is not None else self._default_registry
+
+    async def heartbeat(self, replica_id: str, now: float):
+        self.registry["members"][replica_id] = now
+
+    async def leave(self, replica_id: str):
+        self.registry["members"].pop(replica_id, None)
+
+    async def live_members(self, now: float, ttl: float) -> List[str]:
+        members = self.registry["members"]
+        for replica_id, seen in list(members.items()):
+            if seen < now - ttl:
+                del members[replica_id]
+        return sorted(members)
+
+    async def claim(self, key: str, replica_id: str, ttl: float) -> bool:
+        now = time.time()
+        claims = self.registry["claims"]
+        holder = claims.get(key)
+        if holder is None or holder[1] <= now or holder[0] == replica_id:
+            claims[key] = (replica_id, now + ttl)
+            return True
+        return False
+
+    async def release(self, key: str, replica_id: str):
+        claims = self.registry["claims"]
+        holder = claims.get(key)
+        if holder is not None and holder[0] == replica_id:
+            del claims[key]
+
+    async def close(self):
+        pass
+
+
+class RedisMembership:
+    """Membership store backed by a Redis sorted set of heartbeats"""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as aioredis
+
+        # Bounded timeouts so an unreachable Redis fails fast instead of stalling a cycle
+        self.redis = aioredis.from_url(redis_url, decode_responses=True,
+                                       socket_connect_timeout=5, socket_timeout=5)
+        self._release = self.redis.register_script(RELEASE_SCRIPT)
+
+    async def heartbeat(self, replica_id: str, now: float):
+        await self.redis.zadd(MEMBERS_KEY, {replica_id: now})
+
+    async def leave(self, replica_id: str):
+        await self.redis.zrem(MEMBERS_KEY, replica_id)
+
+    async def live_members(self, now: float, ttl: float) -> List[str]:
+        await self.redis.zremrangebyscore(MEMBERS_KEY, "-inf", now - ttl)
+        return sorted(await self.redis.zrange(MEMBERS_KEY, 0, -1))
+
+    async def claim(self, key: str, replica_id: str, ttl: float) -> bool:
+        claim_key = CLAIM_KEY_PREFIX + key
+        ttl_ms = max(int(ttl * 1000), 1)
+        if await self.redis.set(claim_key, replica_id, nx=True, px=ttl_ms):
+            return True
+        if await self.redis.get(claim_key) == replica_id:
+            await self.redis.pexpire(claim_key, ttl_ms)
+            return True
+        return False
+
+    async def release(self, key: str, replica_id: str):
+        await self._release(keys=[CLAIM_KEY_PREFIX + key], args=[replica_id])
+
+    async def close(self):
+        await self.redis.close()
+
+
+class ShardCoordinator:
+    """Tracks live collector replicas and decides which devices this one polls
+
+    Every replica heartbeats into the membership store and rebuilds the
+    ring from the set of live members. Ring ownership alone can overlap
+    for a heartbeat or two while views converge, so polling is also gated
+    by a per-device claim that lasts a little longer than one collection
+    cycle.
+
+    If the store is unreachable the coordinator keeps retrying and, once
+    its view is older than ``member_ttl``, falls back to polling every
+    device itself: duplicate polls are preferable to unmonitored devices.
+    """
+
+    def __init__(self, replica_id: str, membership, heartbeat_interval: float = 5.0,
+                 member_ttl: float = 15.0, vnodes: int = 128):
+        self.replica_id = replica_id
+        self.membership = membership
+        self.heartbeat_interval = heartbeat_interval
+        self.member_ttl = member_ttl
+        self.ring = ConsistentHashRing([replica_id], vnodes=vnodes)
+        self.is_running = False
+        self.last_refresh = 0.0
+        self.leases: set = set()
+        self.stopped = False
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "ShardCoordinator":
+        """Build a coordinator from COLLECTOR_* environment variables"""
+        replica_id = os.getenv("COLLECTOR_REPLICA_ID") or socket.gethostname()
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            membership = RedisMembership(redis_url)
+        else:
+            logger.warning("REDIS_URL not set, using local shard membership")
+            membership = LocalMembership()
+        return cls(
+            replica_id,
+            membership,
+            heartbeat_interval=float(os.getenv("COLLECTOR_HEARTBEAT_INTERVAL", "5")),
+            member_ttl=float(os.getenv("COLLECTOR_MEMBER_TTL", "15")),
+        )
+
+    async def start(self):
+        """Join the ring and keep heartbeating in the background"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Shard membership unavailable, polling all devices until it recovers: {e}")
+        self.is_running = True
+        self._task = asyncio.create_task(self.heartbeat_loop())
+        logger.info(f"Shard coordinator {self.replica_id} joined with {len(self.ring.nodes)} member(s)")
+
+    async def stop(self):
+        """Leave the ring so peers pick up our devices immediately"""
+        self.is_running = False
+        self.stopped = True
+        if self._task:
+            self._task.cancel()
+        await self._release_leases(list(self.leases))
+        try:
+            await self.membership.leave(self.replica_id)
+        except Exception as e:
+            logger.warning(f"Could not leave shard membership: {e}")
+        finally:
+            await self.membership.close()
+
+    async def refresh(self):
+        """Heartbeat and rebuild the ring if membership changed"""
+        now = time.time()
+        await self.membership.heartbeat(self.replica_id, now)
+        members = set(await self.membership.live_members(now, self.member_ttl))
+        members.add(self.replica_id)
+
+        self.last_refresh = now
+        self._set_members(members)
+
+    def _set_members(self, members: set):
+        if members != self.ring.nodes:
+            for node in self.ring.nodes - members:
+                self.ring.remove_node(node)
+            for node in members - self.ring.nodes:
+                self.ring.add_node(node)
+            logger.info(f"Shard membership changed: {sorted(members)}")
+
+    async def heartbeat_loop(self):
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.heartbeat_interval)
+                await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Shard heartbeat failed: {e}")
+                # Peers have expired us by now; stop trusting our view of them too
+                if time.time() - self.last_refresh > self.member_ttl:
+                    self._set_members({self.replica_id})
+
+    def owns(self, device: Dict[str, Any]) -> bool:
+        return self.ring.get_node(device_key(device)) == self.replica_id
+
+    def assigned_devices(self, devices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Devices this replica is responsible for on the current ring"""
+        return [device for device in devices if self.owns(device)]
+
+    async def claim(self, device: Dict[str, Any], ttl: float) -> bool:
+        """Take or renew the per-device poll lease for ``ttl`` seconds"""
+        if self.stopped:
+            return False
+        key = device_key(device)
+        try:
+            claimed = await self.membership.claim(key, self.replica_id, ttl)
+        except Exception as e:
+            logger.debug(f"Poll lease unavailable for {key}, polling anyway: {e}")
+            return True
+        if claimed:
+            self.leases.add(key)
+        return claimed
+
+    async def release(self, devices: List[Dict[str, Any]]):
+        """Hand poll leases back so the devices' new owners need not wait for them to expire"""
+        await self._release_leases([device_key(device) for device in devices])
+
+    async def _release_leases(self, keys: List[str]):
+        for key in keys:
+            self.leases.discard(key)
+            try:
+                await self.membership.release(key, self.replica_id)
+            except Exception as e:
+                logger.debug(f"Could not release poll lease for {key}: {e}")
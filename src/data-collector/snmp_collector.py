@@ -1,12 +1,245 @@
 # src/data-collector/snmp_collector.py
+"""
+SNMP Data Collector for network devices
+Collects performance metrics from SNMP-enabled devices
+"""
 import asyncio
-from pysnmp.hlapi.asyncio import *
+import logging
+import os
+import time
+from typing import List, Dict, Any, Optional
+
+import yaml
+from prometheus_client import Counter, Gauge, Histogram
+from pysnmp.hlapi.v3arch.asyncio import *
+
+from common.sample_codec import encode_batch
+
+logger = logging.getLogger(__name__)
+
+POLL_DURATION = Histogram(
+    'snmp_poll_duration_seconds', 'Time to poll all OIDs from one device', ['device'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+SNMP_TIMEOUTS = Counter('snmp_timeouts_total', 'SNMP requests that got no response', ['device'])
+SNMP_ERRORS = Counter('snmp_errors_total', 'SNMP requests that failed for other reasons', ['device'])
+CYCLE_DURATION = Histogram(
+    'snmp_collection_cycle_seconds', 'Time to poll every assigned device once',
+    buckets=(1, 5, 10, 30, 60, 120, 300)
+)
+DEVICES_ASSIGNED = Gauge('snmp_devices_assigned', 'Devices this replica is responsible for')
+PUBLISH_FAILURES = Counter('collector_publish_failures_total', 'Sample batches that failed to publish')
+CPU_USAGE = Gauge('cpu_usage_percent', 'Device CPU utilisation reported over SNMP', ['device'])
+MEMORY_USAGE = Gauge('memory_usage_percent', 'Device memory utilisation reported over SNMP', ['device'])
+DEVICE_METRICS = (POLL_DURATION, SNMP_TIMEOUTS, SNMP_ERRORS, CPU_USAGE, MEMORY_USAGE)
+
+DEFAULT_OIDS = {
+    'sysUpTime': '1.3.6.1.2.1.1.3.0',
+    'ifInOctets': '1.3.6.1.2.1.2.2.1.10',
+    'ifOutOctets': '1.3.6.1.2.1.2.2.1.16',
+    'cpuUsage': '1.3.6.1.4.1.9.9.109.1.1.1.1.7.1',
+    'memoryUsage': '1.3.6.1.4.1.9.9.221.1.1.1.1.18.1.1'
+}
+
 
 class SNMPCollector:
-    def __init__(self):
-        self.devices = []
-        self.metrics = {}
-    
-    async def collect_metrics(self, device_ip, community='public'):
-        # Implementation for SNMP data collection
-        pass
+    def __init__(self, config_path: Optional[str] = None, shard=None, producer=None):
+        self.config_path = config_path or os.getenv('DEVICES_CONFIG', 'config/devices.yaml')
+        self.shard = shard
+        self.producer = producer
+        self.topic = os.getenv('KAFKA_METRICS_TOPIC', 'network-metrics')
+        self.devices: List[Dict[str, Any]] = []
+        self.metrics: Dict[str, Any] = {}
+        self.is_running = False
+        self.collection_interval = 30
+        # Used for devices without their own snmp_community (k8s keeps it in snmp-secret)
+        self.default_community = os.getenv('SNMP_COMMUNITY', 'public')
+        self.max_concurrent_polls = int(os.getenv('SNMP_MAX_CONCURRENT_POLLS', '64'))
+        self.last_cycle_duration = 0.0
+        self.exported_devices: set = set()
+        self.snmp_engine = SnmpEngine()
+
+    async def initialize(self):
+        """Initialize SNMP collector"""
+        logger.info("Initializing SNMP Collector")
+        self.devices = await self.load_device_config()
+        self.is_running = True
+
+        asyncio.create_task(self.collection_loop())
+
+    async def load_device_config(self) -> List[Dict[str, Any]]:
+        """Load enabled devices from devices.yaml"""
+        try:
+            with open(self.config_path) as f:
+                config = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            logger.warning(f"Device config {self.config_path} not found")
+            return []
+
+        devices = [d for d in config.get('devices', []) if d.get('enabled', True)]
+        if devices:
+            self.collection_interval = min(d.get('collection_interval', 30) for d in devices)
+        return devices
+
+    def assigned_devices(self) -> List[Dict[str, Any]]:
+        """Devices this replica should poll (all of them when not sharded)"""
+        if self.shard is None:
+            return self.devices
+        return self.shard.assigned_devices(self.devices)
+
+    async def collect_metrics(self, device_ip: str, community: str = 'public',
+                              oids: Optional[Dict[str, str]] = None, port: int = 161):
+        """Collect SNMP metrics from a device"""
+        metrics = {}
+
+        try:
+            target = await UdpTransportTarget.create((device_ip, port))
+            # One GET for every OID; table columns that have no exact instance
+            # are retried together with a single GETNEXT for their first row
+            pending = dict(oids or DEFAULT_OIDS)
+            for command in (get_cmd, next_cmd):
+                errorIndication, errorStatus, errorIndex, varBinds = await command(
+                    self.snmp_engine,
+                    CommunityData(community),
+                    target,
+                    ContextData(),
+                    *(ObjectType(ObjectIdentity(oid)) for oid in pending.values())
+                )
+                if errorIndication:
+                    if 'timeout' in str(errorIndication).lower():
+                        SNMP_TIMEOUTS.labels(device_ip).inc()
+                    else:
+                        SNMP_ERRORS.labels(device_ip).inc()
+                    logger.error(f"SNMP error for {device_ip}: {errorIndication}")
+                    break
+                if errorStatus:
+                    SNMP_ERRORS.labels(device_ip).inc()
+                    logger.error(f"SNMP error for {device_ip}: {errorStatus}")
+                    break
+
+                missing = {}
+                for (name, oid), (returned, value) in zip(pending.items(), varBinds):
+                    if isinstance(value, (NoSuchObject, NoSuchInstance)):
+                        missing[name] = oid
+                        continue
+                    returned = str(returned)
+                    if isinstance(value, EndOfMibView) or \
+                            (returned != oid and not returned.startswith(oid + '.')):
+                        continue
+                    try:
+                        metrics[name] = int(value)
+                    except (TypeError, ValueError):
+                        pass  # non-numeric objects such as sysDescr
+                pending = missing
+                if not pending:
+                    break
+
+        except Exception as e:
+            SNMP_ERRORS.labels(device_ip).inc()
+            logger.error(f"Failed to collect SNMP metrics from {device_ip}: {e}")
+
+        return metrics
+
+    def lease_ttl(self) -> float:
+        """Poll lease length: the cycle period plus headroom, so it outlives the gap between polls"""
+        return max(self.collection_interval, self.last_cycle_duration) * 1.5
+
+    async def poll_device(self, device: Dict[str, Any]):
+        if self.shard is not None and not await self.shard.claim(device, self.lease_ttl()):
+            return
+
+        oids = {o['name']: o['oid'] for o in device.get('oids', [])} or None
+        with POLL_DURATION.labels(device['ip']).time():
+            metrics = await self.collect_metrics(
+                device['ip'],
+                device.get('snmp_community') or device.get('community') or self.default_community,
+                oids,
+                device.get('snmp_port', 161)
+            )
+
+        if metrics:
+            self.update_utilisation(device['ip'], metrics)
+            self.metrics[device['ip']] = {
+                'timestamp': time.time(),
+                'metrics': metrics,
+                'device_info': device
+            }
+
+            logger.info(f"Collected metrics from {device['ip']}: {len(metrics)} OIDs")
+            return self.metrics[device['ip']]
+
+    def update_utilisation(self, device_ip: str, metrics: Dict[str, Any]):
+        """Export the utilisation gauges that alert_rules.yml alerts on"""
+        cpu = metrics.get('cpu_usage', metrics.get('cpuUsage'))
+        if cpu is None and metrics.get('cpu_idle') is not None:
+            # Hosts running net-snmp report idle time (ssCpuIdle), not usage
+            cpu = 100 - metrics['cpu_idle']
+        if cpu is not None:
+            CPU_USAGE.labels(device_ip).set(cpu)
+        total, available = metrics.get('memory_total'), metrics.get('memory_available')
+        if total and available is not None:
+            MEMORY_USAGE.labels(device_ip).set((total - available) / total * 100)
+
+    async def publish(self, records: List[Dict[str, Any]]):
+        """Send one cycle of samples to the AI engine as a binary batch"""
+        if self.producer is None or not records:
+            return
+        try:
+            await self.producer.send_and_wait(self.topic, encode_batch(records))
+        except Exception as e:
+            PUBLISH_FAILURES.inc()
+            logger.error(f"Failed to publish {len(records)} samples: {e}")
+
+    def forget_devices(self, device_ips):
+        """Stop exporting series for devices another replica now polls"""
+        for device_ip in device_ips:
+            self.metrics.pop(device_ip, None)
+            for metric in DEVICE_METRICS:
+                try:
+                    metric.remove(device_ip)
+                except KeyError:
+                    pass
+
+    async def poll_devices(self, devices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Poll devices concurrently, at most max_concurrent_polls at a time"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_polls)
+
+        async def bounded_poll(device):
+            async with semaphore:
+                return await self.poll_device(device)
+
+        results = await asyncio.gather(*(bounded_poll(device) for device in devices))
+        return [record for record in results if record]
+
+    async def collection_loop(self):
+        """Main collection loop"""
+        while self.is_running:
+            try:
+                devices = self.assigned_devices()
+                DEVICES_ASSIGNED.set(len(devices))
+                assigned_ips = {device['ip'] for device in devices}
+                moved_ips = self.exported_devices - assigned_ips
+                self.forget_devices(moved_ips)
+                if self.shard is not None and moved_ips:
+                    await self.shard.release([d for d in self.devices if d['ip'] in moved_ips])
+                self.exported_devices = assigned_ips
+                started = time.monotonic()
+                with CYCLE_DURATION.time():
+                    records = await self.poll_devices(devices)
+                self.last_cycle_duration = time.monotonic() - started
+                await self.publish(records)
+
+                if self.last_cycle_duration > self.collection_interval:
+                    logger.warning(f"Collection cycle took {self.last_cycle_duration:.1f}s, "
+                                   f"longer than the {self.collection_interval}s interval")
+                # Wait out the rest of the interval before the next cycle
+                await asyncio.sleep(max(self.collection_interval - self.last_cycle_duration, 0))
+
+            except Exception as e:
+                logger.error(f"Error in collection loop: {e}")
+                await asyncio.sleep(5)
+
+    async def cleanup(self):
+        """Cleanup resources"""
+        self.is_running = False
+        logger.info("SNMP Collector stopped")
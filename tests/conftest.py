@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Services run from their own directory with src/ on PYTHONPATH (see src/common/__init__.py)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ("src", os.path.join("src", "data-collector"), os.path.join("src", "ai-engine"), "benchmarks"):
+    sys.path.insert(0, os.path.join(REPO_ROOT, path))
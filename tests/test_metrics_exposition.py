@@ -0,0 +1,44 @@
+import asyncio
+
+from prometheus_client import CollectorRegistry, Gauge
+
+from common import metrics_exposition
+from common.metrics_exposition import CachedExposition
+
+
+class CountingRegistry(CollectorRegistry):
+    def __init__(self):
+        super().__init__()
+        self.collections = 0
+        Gauge("devices_up", "Devices answering SNMP", registry=self).set(3)
+
+    def collect(self):
+        self.collections += 1
+        return super().collect()
+
+
+def render_at(exposition, clock, monkeypatch, now, scrapes=1):
+    monkeypatch.setattr(metrics_exposition.time, "monotonic", lambda: clock + now)
+
+    async def scrape():
+        return await asyncio.gather(*(exposition.render() for _ in range(scrapes)))
+
+    return asyncio.run(scrape())
+
+
+def test_concurrent_scrapes_share_one_render(monkeypatch):
+    registry = CountingRegistry()
+    exposition = CachedExposition(registry, ttl=1.0)
+    bodies = render_at(exposition, 1000.0, monkeypatch, 0.0, scrapes=20)
+    assert registry.collections == 1
+    assert len(set(bodies)) == 1 and b"devices_up 3.0" in bodies[0]
+
+
+def test_renders_at_most_once_per_ttl(monkeypatch):
+    registry = CountingRegistry()
+    exposition = CachedExposition(registry, ttl=1.0)
+    render_at(exposition, 1000.0, monkeypatch, 0.0)
+    render_at(exposition, 1000.0, monkeypatch, 0.5)
+    assert registry.collections == 1
+    render_at(exposition, 1000.0, monkeypatch, 1.5)
+    assert registry.collections == 2
@@ -0,0 +1,52 @@
+import socket
+import struct
+
+from netflow_analyzer import V5_HEADER, V5_RECORD, NetFlowAnalyzer
+from prometheus_client import REGISTRY
+
+
+def v5_record(src, dst, src_port, dst_port, protocol=6, packets=10, octets=1500):
+    return V5_RECORD.pack(
+        socket.inet_aton(src), socket.inet_aton(dst), b"\0" * 4, 1, 2, packets, octets,
+        1000, 4000, src_port, dst_port, 0, 0x18, protocol, 0, 0, 0, 24, 24, 0,
+    )
+
+
+def v5_packet(records, version=5, count=None):
+    header = V5_HEADER.pack(version, len(records) if count is None else count, 5000, 1700000000, 0, 1, 0, 0, 0)
+    return header + b"".join(records)
+
+
+def drops(reason):
+    return REGISTRY.get_sample_value("netflow_packets_dropped_total", {"reason": reason}) or 0
+
+
+def test_parses_v5_records():
+    analyzer = NetFlowAnalyzer()
+    flows = analyzer.parse_netflow_packet(v5_packet([
+        v5_record("10.0.0.1", "10.0.0.2", 51000, 443),
+        v5_record("10.0.0.3", "8.8.8.8", 53000, 53, protocol=17, packets=1, octets=64),
+    ]))
+    assert len(flows) == 2 and analyzer.flow_count == 2
+    assert flows[0] == {
+        "src_addr": "10.0.0.1", "dst_addr": "10.0.0.2", "src_port": 51000, "dst_port": 443,
+        "protocol": 6, "packets": 10, "octets": 1500, "input_if": 1, "output_if": 2,
+        "tcp_flags": 0x18, "tos": 0, "duration_ms": 3000, "timestamp": 1700000000,
+    }
+    assert flows[1]["protocol"] == 17 and flows[1]["dst_addr"] == "8.8.8.8"
+
+
+def test_short_packets_are_dropped_as_malformed():
+    analyzer = NetFlowAnalyzer()
+    before = drops("malformed")
+    assert analyzer.parse_netflow_packet(b"\x00\x05") == []
+    # Header claims three records but carries one
+    assert analyzer.parse_netflow_packet(v5_packet([v5_record("10.0.0.1", "10.0.0.2", 1, 2)], count=3)) == []
+    assert drops("malformed") == before + 2
+
+
+def test_other_versions_are_counted_as_unsupported():
+    analyzer = NetFlowAnalyzer()
+    before = drops("unsupported_version")
+    assert analyzer.parse_netflow_packet(v5_packet([], version=9) + struct.pack("!I", 0)) == []
+    assert drops("unsupported_version") == before + 1
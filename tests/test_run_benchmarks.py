@@ -0,0 +1,44 @@
+from run_benchmarks import compare, option_mismatches
+
+BASELINE = {
+    "netflow": {"flows_per_s": 1000.0, "queue_drops": 0, "latency_p95_ms": 2.0},
+    "snmp": {"devices": 1000, "cycle_s": 10.0},
+    "_environment": {"options": {"netflow": {"rate": 5000, "duration": 10}, "snmp": {"devices": 1000}}},
+}
+
+
+def regressed(results, **kwargs):
+    return {(stage, metric) for stage, metric, *_ in compare(results, BASELINE, 0.25, **kwargs)}
+
+
+def test_changes_within_tolerance_pass():
+    assert not regressed({"netflow": {"flows_per_s": 800.0, "queue_drops": 0, "latency_p95_ms": 2.4}})
+
+
+def test_regressions_in_both_directions():
+    assert regressed({"netflow": {"flows_per_s": 700.0}, "snmp": {"cycle_s": 13.0}}) == {
+        ("netflow", "flows_per_s"), ("snmp", "cycle_s"),
+    }
+
+
+def test_zero_baseline_uses_an_absolute_threshold():
+    assert regressed({"netflow": {"queue_drops": 5000}}) == {("netflow", "queue_drops")}
+    assert not regressed({"netflow": {"queue_drops": 5}}, zero_slack=10)
+
+
+def test_latency_slack():
+    results = {"netflow": {"latency_p95_ms": 20.0}}
+    assert regressed(results) == {("netflow", "latency_p95_ms")}
+    assert not regressed(results, slack_ms=25)
+
+
+def test_metrics_without_a_direction_are_ignored():
+    assert not regressed({"snmp": {"devices": 5000}})
+
+
+def test_option_mismatches():
+    assert option_mismatches({"netflow": {"rate": 5000, "duration": 10.0}}, BASELINE) == {}
+    assert option_mismatches({"netflow": {"rate": 20000, "duration": 10}}, BASELINE) == {
+        "netflow": ({"rate": 20000, "duration": 10}, {"rate": 5000, "duration": 10}),
+    }
+    assert "wire" in option_mismatches({"wire": {}}, BASELINE)
@@ -0,0 +1,92 @@
+import zlib
+
+import pytest
+
+from common.sample_codec import FORMAT_VERSION, MAGIC, decode_batch, encode_batch
+
+
+def make_records(values, devices=3):
+    return [
+        {
+            "timestamp": 1700000000.125 + i * 0.5,
+            "metrics": dict(values),
+            "device_info": {"ip": f"10.0.0.{i}", "name": f"Device {i}", "type": "router",
+                            "snmp_community": "secret"},
+        }
+        for i in range(devices)
+    ]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip(compress):
+    records = make_records({"sysUpTime": 123456, "cpuUsage": 23, "ifInOctets": 2 ** 40, "offset": -7})
+    decoded = decode_batch(encode_batch(records, compress=compress))
+    assert [r["metrics"] for r in decoded] == [r["metrics"] for r in records]
+    assert [r["timestamp"] for r in decoded] == [r["timestamp"] for r in records]
+    # Only the label fields travel; SNMP credentials stay on the collector
+    assert decoded[0]["device_info"] == {"ip": "10.0.0.0", "name": "Device 0", "type": "router"}
+
+
+def test_integers_stay_exact_next_to_floats():
+    records = make_records({"big": 2 ** 53 + 1, "counter64": 2 ** 64 - 1, "memory_percent": 41.5})
+    metrics = decode_batch(encode_batch(records))[0]["metrics"]
+    assert metrics == {"big": 2 ** 53 + 1, "counter64": 2 ** 64 - 1, "memory_percent": 41.5}
+    assert type(metrics["big"]) is int and type(metrics["memory_percent"]) is float
+
+
+def test_out_of_order_timestamps():
+    records = make_records({"a": 1})
+    records[1]["timestamp"] -= 60
+    assert [r["timestamp"] for r in decode_batch(encode_batch(records))] == [r["timestamp"] for r in records]
+
+
+def test_empty_batch():
+    assert decode_batch(encode_batch([])) == []
+
+
+def test_unrepresentable_integers_are_rejected():
+    with pytest.raises(ValueError):
+        encode_batch(make_records({"low": -1, "high": 2 ** 63}))
+
+
+def test_binary_is_smaller_than_json():
+    import json
+    records = make_records({f"ifInOctets.{i}": i * 1000 for i in range(50)}, devices=100)
+    assert len(encode_batch(records, compress=False)) < len(json.dumps(records)) / 2
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_every_truncation_raises_value_error(compress):
+    data = encode_batch(make_records({"a": 1, "b": 2.5}), compress=compress)
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            decode_batch(data[:length])
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_corruption_never_leaks_other_exceptions(compress):
+    data = encode_batch(make_records({"a": 1, "b": 2.5}), compress=compress)
+    for i in range(len(data)):
+        corrupted = data[:i] + bytes([data[i] ^ 0x5A]) + data[i + 1:]
+        try:
+            decode_batch(corrupted)
+        except ValueError:
+            pass
+
+
+@pytest.mark.parametrize("data", [
+    b"JSON" + bytes([FORMAT_VERSION, 0]),
+    MAGIC + bytes([FORMAT_VERSION + 1, 0]),
+    MAGIC + bytes([FORMAT_VERSION, 1]) + b"not zlib",
+    encode_batch(make_records({"a": 1})) + b"\0",
+    encode_batch(make_records({"a": 1}), compress=False) + b"\0",
+])
+def test_malformed_batches_raise_value_error(data):
+    with pytest.raises(ValueError):
+        decode_batch(data)
+
+
+def test_truncated_zlib_stream_is_rejected():
+    body = zlib.compress(encode_batch(make_records({"a": 1}), compress=False)[6:])
+    with pytest.raises(ValueError):
+        decode_batch(MAGIC + bytes([FORMAT_VERSION, 1]) + body[:-4])
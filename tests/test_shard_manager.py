@@ -0,0 +1,138 @@
+import asyncio
+from collections import Counter
+
+from shard_manager import ConsistentHashRing, LocalMembership, ShardCoordinator, device_key
+
+DEVICES = [{"ip": f"10.{i // 256}.{i % 256}.1"} for i in range(3000)]
+
+
+def owners(ring):
+    return {device_key(d): ring.get_node(device_key(d)) for d in DEVICES}
+
+
+def test_ring_spreads_devices_evenly():
+    ring = ConsistentHashRing(["collector-0", "collector-1", "collector-2"])
+    load = Counter(owners(ring).values())
+    assert set(load) == {"collector-0", "collector-1", "collector-2"}
+    assert max(load.values()) < 1.3 * len(DEVICES) / 3
+
+
+def test_adding_a_replica_only_moves_devices_onto_it():
+    ring = ConsistentHashRing(["collector-0", "collector-1", "collector-2"])
+    before = owners(ring)
+    ring.add_node("collector-3")
+    after = owners(ring)
+    moved = [key for key in before if before[key] != after[key]]
+    assert all(after[key] == "collector-3" for key in moved)
+    assert 0.15 * len(DEVICES) < len(moved) < 0.35 * len(DEVICES)
+
+
+def test_removing_a_replica_only_moves_its_devices():
+    ring = ConsistentHashRing(["collector-0", "collector-1", "collector-2"])
+    before = owners(ring)
+    ring.remove_node("collector-1")
+    after = owners(ring)
+    assert "collector-1" not in after.values()
+    assert all(before[key] == after[key] for key in before if before[key] != "collector-1")
+
+
+def test_empty_ring_has_no_owner():
+    assert ConsistentHashRing().get_node("10.0.0.1:161") is None
+
+
+def test_claim_is_exclusive_until_it_expires():
+    membership = LocalMembership({"members": {}, "claims": {}})
+    assert asyncio.run(membership.claim("10.0.0.1:161", "a", 30))
+    assert not asyncio.run(membership.claim("10.0.0.1:161", "b", 30))
+    # The holder renews its own lease
+    assert asyncio.run(membership.claim("10.0.0.1:161", "a", 30))
+
+    assert asyncio.run(membership.claim("10.0.0.2:161", "a", -1))
+    assert asyncio.run(membership.claim("10.0.0.2:161", "b", 30))
+
+
+def test_replicas_sharing_membership_split_devices():
+    registry = {"members": {}, "claims": {}}
+    coordinators = [ShardCoordinator(f"collector-{i}", LocalMembership(registry)) for i in range(3)]
+
+    async def join():
+        for coordinator in coordinators:
+            await coordinator.refresh()
+        for coordinator in coordinators:
+            await coordinator.refresh()
+
+    asyncio.run(join())
+    assigned = [coordinator.assigned_devices(DEVICES) for coordinator in coordinators]
+    assert sum(map(len, assigned)) == len(DEVICES)
+    assert all(assigned)
+
+
+class UnreachableMembership(LocalMembership):
+    async def heartbeat(self, replica_id, now):
+        raise ConnectionError("redis down")
+
+    async def claim(self, key, replica_id, ttl):
+        raise ConnectionError("redis down")
+
+
+def test_coordinator_degrades_when_membership_is_unreachable():
+    coordinator = ShardCoordinator("collector-0", UnreachableMembership(), heartbeat_interval=3600)
+
+    async def run():
+        await coordinator.start()
+        claimed = await coordinator.claim(DEVICES[0], 30)
+        await coordinator.stop()
+        return claimed
+
+    assert asyncio.run(run())
+    assert coordinator.assigned_devices(DEVICES) == DEVICES
+
+
+def claimed_by(coordinator, devices):
+    async def claim_all():
+        return [await coordinator.claim(device, 45) for device in devices]
+
+    return asyncio.run(claim_all())
+
+
+def test_stopped_replica_hands_its_devices_over_immediately():
+    registry = {"members": {}, "claims": {}}
+    a = ShardCoordinator("collector-a", LocalMembership(registry))
+    b = ShardCoordinator("collector-b", LocalMembership(registry))
+    for coordinator in (a, b, a, b):
+        asyncio.run(coordinator.refresh())
+    assert all(claimed_by(a, a.assigned_devices(DEVICES)))
+
+    asyncio.run(a.stop())
+    asyncio.run(b.refresh())
+    assert b.assigned_devices(DEVICES) == DEVICES
+    assert all(claimed_by(b, DEVICES))
+    assert not registry["claims"] or all(holder == "collector-b" for holder, _ in registry["claims"].values())
+    # A stopping replica never takes a lease back
+    assert not any(claimed_by(a, DEVICES[:10]))
+
+
+def test_joining_replica_takes_over_released_devices():
+    registry = {"members": {}, "claims": {}}
+    a = ShardCoordinator("collector-a", LocalMembership(registry))
+    asyncio.run(a.refresh())
+    assert all(claimed_by(a, DEVICES))
+
+    b = ShardCoordinator("collector-b", LocalMembership(registry))
+    asyncio.run(b.refresh())
+    asyncio.run(a.refresh())
+    moved = [device for device in DEVICES if not a.owns(device)]
+    assert moved and b.assigned_devices(DEVICES) == moved
+    # Until the old owner lets go, its leases still hold
+    assert not any(claimed_by(b, moved[:10]))
+
+    asyncio.run(a.release(moved))
+    assert all(claimed_by(b, moved))
+    assert len(a.leases) == len(DEVICES) - len(moved)
+
+
+def test_release_leaves_other_replicas_leases_alone():
+    membership = LocalMembership({"members": {}, "claims": {}})
+    assert asyncio.run(membership.claim("10.0.0.1:161", "a", 30))
+    asyncio.run(membership.release("10.0.0.1:161", "b"))
+    assert not asyncio.run(membership.claim("10.0.0.1:161", "b", 30))
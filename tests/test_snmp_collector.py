@@ -0,0 +1,59 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+
+import snmp_collector
+from snmp_collector import SNMPCollector
+
+
+def cpu_usage(device_ip):
+    return REGISTRY.get_sample_value("cpu_usage_percent", {"device": device_ip})
+
+
+def exported_series(device_ip):
+    return [
+        sample for metric in REGISTRY.collect() for sample in metric.samples
+        if sample.labels.get("device") == device_ip
+    ]
+
+
+def test_cpu_usage_is_exported_as_is():
+    SNMPCollector().update_utilisation("192.0.2.1", {"cpu_usage": 91})
+    assert cpu_usage("192.0.2.1") == 91
+
+
+def test_cpu_idle_is_exported_as_usage():
+    SNMPCollector().update_utilisation("192.0.2.2", {"cpu_idle": 87})
+    assert cpu_usage("192.0.2.2") == 13
+
+
+def test_devices_without_a_community_use_snmp_community(monkeypatch):
+    monkeypatch.setenv("SNMP_COMMUNITY", "from-secret")
+    collector = SNMPCollector()
+    communities = {}
+
+    async def collect_metrics(device_ip, community, oids, port):
+        communities[device_ip] = community
+        return {}
+
+    collector.collect_metrics = collect_metrics
+    asyncio.run(collector.poll_devices([
+        {"ip": "192.0.2.3"},
+        {"ip": "192.0.2.4", "snmp_community": "per-device"},
+    ]))
+    assert communities == {"192.0.2.3": "from-secret", "192.0.2.4": "per-device"}
+
+
+def test_forget_devices_removes_their_series():
+    collector = SNMPCollector()
+    for device_ip in ("192.0.2.10", "192.0.2.11"):
+        collector.update_utilisation(device_ip, {"cpu_usage": 50, "memory_total": 100, "memory_available": 25})
+        snmp_collector.POLL_DURATION.labels(device_ip).observe(0.2)
+        snmp_collector.SNMP_TIMEOUTS.labels(device_ip).inc()
+        collector.metrics[device_ip] = {"timestamp": 0, "metrics": {"cpu_usage": 50}, "device_info": {}}
+    assert exported_series("192.0.2.10")
+
+    collector.forget_devices({"192.0.2.10", "192.0.2.99"})
+    assert exported_series("192.0.2.10") == []
+    assert "192.0.2.10" not in collector.metrics
+    assert cpu_usage("192.0.2.11") == 50 and "192.0.2.11" in collector.metrics
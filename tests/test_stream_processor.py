@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import stream_processor
+from common.sample_codec import encode_batch
+from stream_processor import StreamProcessor
+
+BATCH = encode_batch([
+    {"timestamp": 1700000000.0, "metrics": {"cpu_usage": 10}, "device_info": {"ip": "10.0.0.1"}},
+    {"timestamp": 1700000000.5, "metrics": {"cpu_usage": 20}, "device_info": {"ip": "10.0.0.2"}},
+])
+
+
+class FakeConsumer:
+    """Stands in for AIOKafkaConsumer: the first ``failures`` starts raise"""
+
+    failures = 0
+    started = 0
+
+    def __init__(self, *topics, **config):
+        self.messages = asyncio.Queue()
+        for value in (b"garbage", BATCH):
+            self.messages.put_nowait(SimpleNamespace(value=value))
+
+    async def start(self):
+        FakeConsumer.started += 1
+        if FakeConsumer.started <= FakeConsumer.failures:
+            raise ConnectionError("broker unreachable")
+
+    async def stop(self):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.messages.get()
+
+
+def run_processor(monkeypatch, failures, analyze):
+    monkeypatch.setattr(FakeConsumer, "failures", failures)
+    monkeypatch.setattr(FakeConsumer, "started", 0)
+    monkeypatch.setattr(stream_processor, "AIOKafkaConsumer", FakeConsumer)
+    processor = StreamProcessor("kafka:9092", retry_interval=0.01)
+    processor.analyze_realtime_data = analyze
+
+    async def run():
+        await processor.start()
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+        task = processor._task
+        await processor.stop()
+        return task
+
+    return processor, asyncio.run(run())
+
+
+def test_unreachable_broker_is_retried_in_the_background(monkeypatch):
+    analyzed = []
+
+    async def analyze(record):
+        analyzed.append(record["device_info"]["ip"])
+
+    processor, task = run_processor(monkeypatch, failures=3, analyze=analyze)
+    assert FakeConsumer.started == 4
+    assert analyzed == ["10.0.0.1", "10.0.0.2"]
+    assert task.done() and processor.kafka_consumer is None
+
+
+def test_analysis_errors_do_not_stop_consumption(monkeypatch):
+    analyzed = []
+
+    async def analyze(record):
+        analyzed.append(record["device_info"]["ip"])
+        raise RuntimeError("model exploded")
+
+    _, task = run_processor(monkeypatch, failures=0, analyze=analyze)
+    assert analyzed == ["10.0.0.1", "10.0.0.2"]
+    assert task.done()